@@ -0,0 +1,89 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel
+
+from app import katalog
+
+def cek_token(x_admin_token: str = Header("")):
+    token = os.getenv("ADMIN_TOKEN", "")
+    # compare_digest: waktu perbandingan tidak bocorkan berapa karakter awal yang cocok
+    if not token or not hmac.compare_digest(x_admin_token.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Token admin salah atau ADMIN_TOKEN belum diset.")
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(cek_token)])
+
+class Mobil(BaseModel):
+    nama_mobil: str
+    harga: str
+    tahun: int
+    usia: int = 0
+    bahan_bakar: str
+    transmisi: str
+    kapasitas_mesin: str = "-"
+    harga_angka: Optional[int] = None
+
+class UbahMobil(BaseModel):
+    nama_mobil: Optional[str] = None
+    harga: Optional[str] = None
+    tahun: Optional[int] = None
+    usia: Optional[int] = None
+    bahan_bakar: Optional[str] = None
+    transmisi: Optional[str] = None
+    kapasitas_mesin: Optional[str] = None
+    harga_angka: Optional[int] = None
+
+class Batch(BaseModel):
+    sisip: list[Mobil] = []
+    ubah: dict[int, UbahMobil] = {}
+    hapus: list[int] = []
+
+def _ringkas(snap: katalog.Snapshot) -> dict:
+    return {"versi": snap.versi, "jumlah": len(snap.data)}
+
+def _terapkan(**kwargs) -> katalog.Snapshot:
+    try:
+        return katalog.terapkan(**kwargs)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/katalog")
+def info_katalog():
+    return _ringkas(katalog.snapshot())
+
+@router.post("/mobil")
+def tambah_mobil(mobil: Mobil):
+    snap = _terapkan(sisip=[mobil.model_dump(exclude_none=True)])
+    return {**_ringkas(snap), "id": int(snap.data.index.max())}
+
+@router.patch("/mobil/{id_mobil}")
+def ubah_mobil(id_mobil: int, mobil: UbahMobil):
+    snap = _terapkan(ubah={id_mobil: mobil.model_dump(exclude_none=True)})
+    return {**_ringkas(snap), "id": id_mobil}
+
+@router.delete("/mobil/{id_mobil}")
+def hapus_mobil(id_mobil: int):
+    snap = _terapkan(hapus=[id_mobil])
+    return {**_ringkas(snap), "id": id_mobil}
+
+@router.post("/batch")
+def batch(perubahan: Batch):
+    snap = _terapkan(
+        sisip=[m.model_dump(exclude_none=True) for m in perubahan.sisip],
+        ubah={i: m.model_dump(exclude_none=True) for i, m in perubahan.ubah.items()},
+        hapus=perubahan.hapus,
+    )
+    return _ringkas(snap)
+
+@router.post("/muat-ulang")
+def muat_ulang():
+    try:
+        return _ringkas(katalog.muat_ulang())
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
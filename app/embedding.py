@@ -1,63 +1,76 @@
 from pathlib import Path
 from tqdm import tqdm
-import pandas as pd
 import json
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 
+from app.katalog import muat_csv
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DATA_CSV = ROOT_DIR / "app" / "data" / "data_mobil_final.csv"
 CHROMA_DIR = ROOT_DIR / "chroma"
 
+REQUIRED_COLS = ['nama mobil', 'harga', 'tahun', 'usia', 'bahan bakar', 'transmisi', 'kapasitas mesin']
+
+def dokumen_mobil(row):
+    """Teks + metadata Chroma untuk satu baris katalog (kolom huruf kecil)."""
+    try:
+        usia = int(str(row['usia']).strip())
+    except Exception:
+        usia = 0
+
+    try:
+        harga_str = str(row['harga']).replace("Rp", "").replace(".", "").replace(",", "").strip()
+        harga_angka = int(harga_str)
+    except Exception:
+        harga_angka = 0
+
+    kapasitas = str(row.get('kapasitas mesin', '-') or '-').strip()
+
+    deskripsi = (
+        f"{row['nama mobil']} ({row['tahun']}), tahun {row['tahun']}, harga {row['harga']}, "
+        f"usia {row['usia']} tahun, bahan bakar {row['bahan bakar']}, "
+        f"transmisi {row['transmisi']}, kapasitas mesin {kapasitas}"
+    )
+    metadata = {
+        "nama_mobil": str(row['nama mobil']).strip(),
+        "tahun": int(row['tahun']),
+        "harga": str(row['harga']).strip(),
+        "harga_angka": harga_angka,
+        "usia": usia,
+        "bahan_bakar": str(row['bahan bakar']).strip().lower(),
+        "transmisi": str(row['transmisi']).strip().lower(),
+        "kapasitas_mesin": kapasitas,
+    }
+    return deskripsi, metadata
+
 def simpan_vektor_mobil():
     print("[INFO] Membaca dataset:", DATA_CSV)
-    df = pd.read_csv(DATA_CSV)
+    df = muat_csv(DATA_CSV)
 
-    required_cols = ['Nama Mobil', 'Harga', 'Tahun', 'Usia', 'Bahan Bakar', 'Transmisi', 'Kapasitas Mesin']
-    for col in required_cols:
+    for col in REQUIRED_COLS:
         if col not in df.columns:
             raise ValueError(f"Kolom '{col}' tidak ditemukan di CSV.")
 
-    texts, metadatas = [], []
-    for _, row in tqdm(df.iterrows(), total=len(df)):
-        try:
-            usia = int(str(row['Usia']).strip())
-        except Exception:
-            usia = 0
-
-        try:
-            harga_str = str(row['Harga']).replace("Rp", "").replace(".", "").replace(",", "").strip()
-            harga_angka = int(harga_str)
-        except Exception:
-            harga_angka = 0
-
-        kapasitas = str(row.get('Kapasitas Mesin', '-') or '-').strip()
-
-        deskripsi = (
-            f"{row['Nama Mobil']} ({row['Tahun']}), tahun {row['Tahun']}, harga {row['Harga']}, "
-            f"usia {row['Usia']} tahun, bahan bakar {row['Bahan Bakar']}, "
-            f"transmisi {row['Transmisi']}, kapasitas mesin {kapasitas}"
-        )
+    texts, metadatas, ids = [], [], []
+    for id_mobil, row in tqdm(df.iterrows(), total=len(df)):
+        deskripsi, metadata = dokumen_mobil(row)
         texts.append(deskripsi)
-        metadatas.append({
-            "nama_mobil": str(row['Nama Mobil']).strip(),
-            "tahun": int(row['Tahun']),
-            "harga": str(row['Harga']).strip(),
-            "harga_angka": harga_angka,
-            "usia": usia,
-            "bahan_bakar": str(row['Bahan Bakar']).strip().lower(),
-            "transmisi": str(row['Transmisi']).strip().lower(),
-            "kapasitas_mesin": kapasitas,
-        })
+        metadatas.append(metadata)
+        ids.append(str(id_mobil))
 
     print("[INFO] Contoh metadata:", json.dumps(metadatas[0], indent=2))
     embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
     print("[INFO] Menyimpan ke ChromaDB:", CHROMA_DIR)
+    # Kosongkan koleksi lama dulu; from_texts hanya menambah, jadi index lama ber-id UUID ikut tersisa
+    Chroma(persist_directory=str(CHROMA_DIR), embedding_function=embeddings).delete_collection()
+    # id dokumen = id katalog, supaya update/hapus dari app.katalog bisa menyasar dokumen yang tepat
     Chroma.from_texts(
         texts=texts,
         embedding=embeddings,
         metadatas=metadatas,
+        ids=ids,
         persist_directory=str(CHROMA_DIR)
     )
     print("[✅ SELESAI] Embedding tersimpan.")
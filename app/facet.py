@@ -0,0 +1,218 @@
+import re
+from bisect import bisect_left, bisect_right
+
+import pandas as pd
+
+TAHUN_SEKARANG = 2025
+
+# Batas atas (eksklusif) tiap bucket harga, dalam rupiah
+BUCKET_HARGA = [
+    (100_000_000, "< 100 juta"),
+    (150_000_000, "100-150 juta"),
+    (200_000_000, "150-200 juta"),
+    (300_000_000, "200-300 juta"),
+    (500_000_000, "300-500 juta"),
+    (1_000_000_000, "500 juta-1 miliar"),
+    (None, ">= 1 miliar"),
+]
+
+# ===== Parsing pertanyaan → filter (dipakai bersama oleh /jawab dan /facet) =====
+def ekstrak_filter(pertanyaan: str, exclude: str = "") -> dict:
+    q = pertanyaan.lower()
+    filt = {
+        "tahun_min": None,
+        "tahun_di_bawah": None,
+        "transmisi": None,
+        "bahan_bakar": [],
+        "harga_maks": None,
+        "irit": False,
+        "exclude": [],
+    }
+
+    # Usia → tahun minimum
+    m_usia = re.search(r"usia (?:di bawah|kurang dari) (\d+)\s*tahun", q)
+    if m_usia:
+        filt["tahun_min"] = TAHUN_SEKARANG - int(m_usia.group(1))
+
+    # Transmisi
+    if "matic" in q and "manual" not in q:
+        filt["transmisi"] = "matic"
+    if "manual" in q and "matic" not in q:
+        filt["transmisi"] = "manual"
+
+    # Bahan bakar
+    filt["bahan_bakar"] = [bb for bb in ["diesel", "bensin", "hybrid", "listrik"] if bb in q]
+
+    # Harga (contoh: "di bawah 150.000.000" / "max 200000000")
+    m_harga = re.search(r"(?:di bawah|max(?:imal)?|<=?) ?rp? ?(\d[\d\.]*)", q)
+    if m_harga:
+        filt["harga_maks"] = int(m_harga.group(1).replace(".", ""))
+
+    # Tahun ke atas
+    m_tahun_atas = re.search(r"tahun (\d{4}) ke atas", q)
+    if m_tahun_atas:
+        tahun = int(m_tahun_atas.group(1))
+        filt["tahun_min"] = max(filt["tahun_min"] or tahun, tahun)
+
+    # Tahun di bawah
+    m_tahun_bawah = re.search(r"tahun (?:di bawah|kurang dari) (\d{4})", q)
+    if m_tahun_bawah:
+        filt["tahun_di_bawah"] = int(m_tahun_bawah.group(1))
+
+    # Sinonim irit/hemat → bensin/hybrid
+    filt["irit"] = "irit" in q or "hemat" in q
+
+    # Exclude list (nama mobil yang sudah ditampilkan)
+    filt["exclude"] = [x.strip().lower() for x in exclude.split(",") if x.strip()]
+    return filt
+
+def label_bucket_harga(harga: int) -> str:
+    for batas, label in BUCKET_HARGA:
+        if batas is None or harga < batas:
+            return label
+    return BUCKET_HARGA[-1][1]
+
+def _posisi_bit(bitmap: int) -> list:
+    posisi = []
+    while bitmap:
+        low = bitmap & -bitmap
+        posisi.append(low.bit_length() - 1)
+        bitmap ^= low
+    return posisi
+
+def _angka(kolom: pd.Series) -> list:
+    # Nilai kosong tetap None (bukan 0), seperti pandas: NaN tidak lolos filter <, <=, >=
+    return [None if pd.isna(v) else int(v) for v in pd.to_numeric(kolom, errors="coerce")]
+
+def _kolom_facet(df: pd.DataFrame) -> dict:
+    """Nilai facet per baris; None = baris tidak masuk bucket facet tersebut."""
+    return {
+        "bahan_bakar": df["bahan bakar"].fillna("").astype(str).str.strip().tolist(),
+        "transmisi": df["transmisi"].fillna("").astype(str).str.strip().tolist(),
+        "tahun": [None if t is None else str(t) for t in _angka(df["tahun"])],
+        "harga": [None if h is None else label_bucket_harga(h) for h in _angka(df["harga_angka"])],
+    }
+
+class _IndeksRentang:
+    """Bitmap prefiks atas baris yang diurutkan menurut nilai numerik.
+
+    Baris bernilai None tidak pernah masuk hasil perbandingan mana pun.
+    """
+
+    def __init__(self, ids: list, nilai: list):
+        urut = sorted((i for i, v in enumerate(nilai) if v is not None), key=lambda i: nilai[i])
+        self.nilai = [nilai[i] for i in urut]
+        self.prefiks = [0]
+        for i in urut:
+            self.prefiks.append(self.prefiks[-1] | (1 << ids[i]))
+
+    def kurang_dari(self, x: int) -> int:
+        return self.prefiks[bisect_left(self.nilai, x)]
+
+    def paling_banyak(self, x: int) -> int:
+        return self.prefiks[bisect_right(self.nilai, x)]
+
+    def paling_sedikit(self, x: int) -> int:
+        return self.prefiks[-1] ^ self.kurang_dari(x)
+
+# ===== Indeks facet berbasis bitmap (int Python sebagai bitset) =====
+class FacetIndex:
+    """Dibangun sekali dari katalog; tiap mobil = satu bit (id = index DataFrame).
+
+    Filter dijawab dengan AND/OR bitmap, hitungan facet dengan ``int.bit_count``.
+    Perubahan katalog lewat ``dengan_perubahan`` menghasilkan indeks baru tanpa
+    mengubah indeks lama (copy-on-write).
+    """
+
+    FACET = ("bahan_bakar", "transmisi", "tahun", "harga")
+
+    def __init__(self, df: pd.DataFrame):
+        self.semua = 0
+        self.bitmap = {f: {} for f in self.FACET}
+        self.nama = {}
+        self._tambah(df)
+        self._bangun_rentang(df)
+
+    def _tambah(self, df: pd.DataFrame):
+        ids = [int(i) for i in df.index]
+        for facet, nilai in _kolom_facet(df).items():
+            for i, v in zip(ids, nilai):
+                if v is None:
+                    continue
+                self.bitmap[facet][v] = self.bitmap[facet].get(v, 0) | (1 << i)
+        for i, n in zip(ids, df["nama mobil"].fillna("").astype(str).str.lower()):
+            self.nama[n] = self.nama.get(n, 0) | (1 << i)
+        for i in ids:
+            self.semua |= 1 << i
+
+    def _bangun_rentang(self, df: pd.DataFrame):
+        ids = [int(i) for i in df.index]
+        self.tahun = _IndeksRentang(ids, _angka(df["tahun"]))
+        self.harga = _IndeksRentang(ids, _angka(df["harga_angka"]))
+
+    def dengan_perubahan(self, df: pd.DataFrame, diubah: pd.DataFrame, dihapus: list) -> "FacetIndex":
+        """Indeks baru untuk katalog ``df`` setelah baris ``diubah`` di-upsert dan id ``dihapus`` dibuang."""
+        keluar = 0
+        for i in list(diubah.index) + list(dihapus):
+            keluar |= 1 << int(i)
+
+        def _buang(peta: dict) -> dict:
+            return {v: bm & ~keluar for v, bm in peta.items() if bm & ~keluar}
+
+        baru = FacetIndex.__new__(FacetIndex)
+        baru.semua = self.semua & ~keluar
+        baru.bitmap = {f: _buang(self.bitmap[f]) for f in self.FACET}
+        baru.nama = _buang(self.nama)
+        baru._tambah(diubah)
+        baru._bangun_rentang(df)
+        return baru
+
+    def _mengandung(self, facet: str, pola: str) -> int:
+        # Setara str.contains(pola, case=False): OR semua nilai yang cocok
+        hasil = 0
+        for v, bm in self.bitmap[facet].items():
+            if re.search(pola, v, flags=re.IGNORECASE):
+                hasil |= bm
+        return hasil
+
+    def cari(self, filt: dict) -> int:
+        bm = self.semua
+        if filt["tahun_min"] is not None:
+            bm &= self.tahun.paling_sedikit(filt["tahun_min"])
+        if filt["transmisi"]:
+            bm &= self._mengandung("transmisi", filt["transmisi"])
+        for bb in filt["bahan_bakar"]:
+            bm &= self._mengandung("bahan_bakar", bb)
+        if filt["harga_maks"] is not None:
+            bm &= self.harga.paling_banyak(filt["harga_maks"])
+        if filt["tahun_di_bawah"] is not None:
+            bm &= self.tahun.kurang_dari(filt["tahun_di_bawah"])
+        if filt["irit"]:
+            bm &= self._mengandung("bahan_bakar", "bensin|hybrid")
+        for n in filt["exclude"]:
+            bm &= ~self.nama.get(n, 0)
+        return bm
+
+    def hitung(self, bitmap: int) -> dict:
+        counts = {}
+        for facet in self.FACET:
+            counts[facet] = {
+                v: c for v, bm in self.bitmap[facet].items()
+                if (c := (bm & bitmap).bit_count())
+            }
+        counts["harga"] = {
+            label: counts["harga"][label] for _, label in BUCKET_HARGA if label in counts["harga"]
+        }
+        counts["tahun"] = dict(sorted(counts["tahun"].items()))
+        return counts
+
+    def id_cocok(self, bitmap: int) -> list:
+        return _posisi_bit(bitmap)
+
+    def facet(self, pertanyaan: str, exclude: str = "") -> dict:
+        bm = self.cari(ekstrak_filter(pertanyaan, exclude))
+        return {
+            "total": bm.bit_count(),
+            "facet": self.hitung(bm),
+            "ids": self.id_cocok(bm),
+        }
@@ -0,0 +1,258 @@
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+from app.facet import FacetIndex
+
+APP_DIR = Path(__file__).resolve().parent
+DATA_CSV = APP_DIR / "data" / "data_mobil_final.csv"
+
+# Nama field API → nama kolom katalog (huruf kecil, seperti di DataFrame)
+FIELD_KOLOM = {
+    "nama_mobil": "nama mobil",
+    "harga": "harga",
+    "tahun": "tahun",
+    "usia": "usia",
+    "bahan_bakar": "bahan bakar",
+    "transmisi": "transmisi",
+    "kapasitas_mesin": "kapasitas mesin",
+    "harga_angka": "harga_angka",
+}
+
+def bersihkan_harga(h):
+    if pd.isna(h): return 0
+    s = str(h)
+    return int(re.sub(r"\D", "", s)) if re.search(r"\d", s) else 0
+
+# ===== Baca dataset =====
+def muat_csv(path: Path = DATA_CSV) -> pd.DataFrame:
+    """Baca CSV katalog; index DataFrame = id mobil (kolom ``id`` kalau ada, selain itu nomor baris)."""
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    df.attrs["kolom_asli"] = [c for c in df.columns if c.lower() != "id"]
+    df.columns = df.columns.str.lower()
+
+    if "harga_angka" not in df.columns:
+        df["harga_angka"] = df["harga"].apply(bersihkan_harga)
+
+    if "id" in df.columns:
+        ids = pd.to_numeric(df["id"], errors="coerce")
+        kosong = ids.isna()
+        if kosong.any():
+            mulai = int(ids.max()) + 1 if (~kosong).any() else 0
+            ids[kosong] = range(mulai, mulai + int(kosong.sum()))
+        df.index = ids.astype(int)
+        df = df.drop(columns="id")
+        df.attrs["id_baru"] = bool(kosong.any())
+    else:
+        df.attrs["id_baru"] = True
+    df.index.name = "id"
+    return df
+
+def simpan_csv(df: pd.DataFrame, path: Path = DATA_CSV):
+    """Tulis katalog (dengan kolom ``id``) secara atomik, header asli dipertahankan."""
+    kolom_asli = df.attrs.get("kolom_asli") or list(df.columns)
+    keluar = df.copy()
+    # Tulis harga_angka sebagai bilangan bulat seperti CSV aslinya (bukan 458000000.0)
+    keluar["harga_angka"] = pd.to_numeric(keluar["harga_angka"], errors="coerce").round().astype("Int64")
+    keluar = keluar.rename(columns={c.lower(): c for c in kolom_asli})
+    tmp = path.with_suffix(".tmp")
+    keluar.to_csv(tmp, index=True, index_label="id")
+    os.replace(tmp, path)
+
+# ===== Snapshot katalog (copy-on-write) =====
+class Snapshot(NamedTuple):
+    versi: int
+    data: pd.DataFrame
+    facet: FacetIndex
+    sidik: str      # hash isi katalog; sama antar restart/worker selama datanya sama (dipakai ETag)
+
+def _sidik_data(df: pd.DataFrame) -> str:
+    return format(int(pd.util.hash_pandas_object(df, index=True).sum()) & (2**64 - 1), "016x")
+
+_data_awal = muat_csv()
+_snapshot = Snapshot(0, _data_awal, FacetIndex(_data_awal), _sidik_data(_data_awal))
+_lock_tulis = threading.Lock()
+_pendengar = []
+# path → st_mtime_ns file yang isinya sudah tercermin di snapshot aktif
+_mtime_dikenal = {DATA_CSV: DATA_CSV.stat().st_mtime_ns}
+
+def snapshot() -> Snapshot:
+    """Snapshot aktif. Request cukup memegang objek ini; perubahan berikutnya tidak mengubahnya."""
+    return _snapshot
+
+def daftarkan_pendengar(fn):
+    """``fn(snapshot, diubah, dihapus)`` dipanggil sebelum versi baru dipasang (mis. sinkron vector store).
+
+    Exception dari ``fn`` membatalkan perubahan dan diteruskan sebagai ``RuntimeError``.
+    """
+    _pendengar.append(fn)
+
+def _baris(data: dict) -> dict:
+    baris = {FIELD_KOLOM.get(k, k): v for k, v in data.items() if v is not None}
+    if "harga" in baris and pd.isna(baris.get("harga_angka")):
+        baris["harga_angka"] = bersihkan_harga(baris["harga"])
+    return baris
+
+def _sama(a, b) -> bool:
+    if pd.isna(a) and pd.isna(b):
+        return True
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+def _berubah(lama: pd.Series, baris: dict) -> dict:
+    return {k: v for k, v in baris.items() if k not in lama.index or not _sama(lama[k], v)}
+
+def _pulihkan_file(path: Path, isi: bytes):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(isi)
+    os.replace(tmp, path)
+
+def _terapkan(sisip: dict, ubah: dict, hapus: list, persist: bool, path: Path) -> Snapshot:
+    # Dipanggil dengan _lock_tulis sudah dipegang
+    global _snapshot
+    lama = _snapshot
+    df = lama.data
+
+    tidak_ada = [i for i in list(ubah) + hapus if i not in df.index]
+    if tidak_ada:
+        raise KeyError(f"id tidak ditemukan: {tidak_ada}")
+    bentrok = sorted(set(ubah) & set(hapus))
+    if bentrok:
+        raise ValueError(f"id ada di ubah sekaligus hapus: {bentrok}")
+
+    # Field yang nilainya tidak berubah dibuang; kalau tidak ada yang tersisa, tidak ada versi baru
+    ubah = {i: b for i, data in ubah.items() if (b := _berubah(df.loc[i], _baris(data)))}
+    if not (sisip or ubah or hapus):
+        return lama
+
+    diubah = df.loc[list(ubah)].astype(object)
+    for i, baris in ubah.items():
+        for kolom, nilai in baris.items():
+            diubah.at[i, kolom] = nilai
+    if sisip:
+        baru = pd.DataFrame([_baris(d) for d in sisip.values()], index=list(sisip))
+        diubah = pd.concat([diubah, baru.reindex(columns=df.columns)])
+    diubah.index.name = "id"
+
+    diubah = diubah.infer_objects()
+    df_baru = pd.concat([df.drop(index=list(diubah.index) + hapus, errors="ignore"), diubah]).sort_index().infer_objects()
+    df_baru.attrs = dict(df.attrs)
+    baru = Snapshot(
+        lama.versi + 1, df_baru, lama.facet.dengan_perubahan(df_baru, diubah, hapus), _sidik_data(df_baru)
+    )
+
+    # Urutan: tulis CSV → pendengar (mis. Chroma) → pasang versi baru. Kalau salah satu
+    # gagal, versi baru tidak dipasang dan CSV dikembalikan, supaya katalog di memori,
+    # file dan vector store tidak diam-diam berbeda
+    cadangan = path.read_bytes() if persist else None
+    if persist:
+        simpan_csv(df_baru, path)
+    try:
+        for fn in _pendengar:
+            try:
+                fn(baru, diubah, hapus)
+            except Exception as e:
+                raise RuntimeError(f"sinkron {getattr(fn, '__name__', fn)} gagal: {e}") from e
+    except RuntimeError:
+        if persist:
+            _pulihkan_file(path, cadangan)
+        raise
+
+    if persist:
+        _mtime_dikenal[path] = path.stat().st_mtime_ns
+    _snapshot = baru
+    return _snapshot
+
+def terapkan(sisip: list = (), ubah: dict = None, hapus: list = (), persist: bool = True) -> Snapshot:
+    """Terapkan insert/update/delete sebagai satu versi baru.
+
+    ``sisip``: list dict mobil baru (id diberikan otomatis), ``ubah``: {id: dict
+    field yang berubah}, ``hapus``: list id. Snapshot lama tidak disentuh sehingga
+    request yang sedang berjalan tetap konsisten.
+
+    Kalau admin dan mode pantau file sama-sama aktif, keduanya tidak saling menimpa:
+    edit CSV dari luar yang belum termuat diterapkan dulu, baru perubahan ini di
+    atasnya. Untuk field yang sama, perubahan yang diterapkan terakhir yang menang.
+    """
+    with _lock_tulis:
+        path = DATA_CSV
+        if persist and _mtime_dikenal.get(path) != path.stat().st_mtime_ns:
+            _muat_ulang(path)
+        df = _snapshot.data
+        mulai = int(df.index.max()) + 1 if len(df) else 0
+        sisip = {mulai + n: d for n, d in enumerate(sisip)}
+        return _terapkan(sisip, dict(ubah or {}), list(hapus), persist, path)
+
+def _sidik(df: pd.DataFrame, kolom: list) -> pd.DataFrame:
+    # Bentuk teks yang sebanding antara data di memori dan hasil baca CSV (458000000 == 458000000.0)
+    return df[kolom].astype(str).fillna("").replace({r"\.0$": "", r"^(nan|<NA>|None)$": ""}, regex=True)
+
+def muat_ulang(path: Path = None) -> Snapshot:
+    """Baca ulang CSV lalu terapkan selisihnya (berdasarkan id) secara inkremental."""
+    with _lock_tulis:
+        return _muat_ulang(path or DATA_CSV)
+
+def _muat_ulang(path: Path) -> Snapshot:
+    # Dipanggil dengan _lock_tulis sudah dipegang: baca + diff + terapkan tidak bisa
+    # diselingi tulisan admin, jadi tulisan itu tidak ikut "dibatalkan" oleh isi file lama
+    mtime = path.stat().st_mtime_ns
+    df_file = muat_csv(path)
+    df = _snapshot.data
+    kolom = [c for c in df.columns if c in df_file.columns]
+
+    sama = df_file.index.intersection(df.index)
+    tulis_balik = df_file.attrs.get("id_baru", False)
+    beda_kolom = _sidik(df_file.loc[sama], kolom) != _sidik(df.loc[sama], kolom)
+    if "harga" in kolom and "harga_angka" in kolom:
+        # harga_angka turunan dari harga: kalau hanya "Harga" yang diedit, hitung ulang
+        basi = sama[(beda_kolom["harga"] & ~beda_kolom["harga_angka"]).to_numpy()]
+        df_file.loc[basi, "harga_angka"] = df_file.loc[basi, "harga"].apply(bersihkan_harga)
+        tulis_balik = tulis_balik or len(basi) > 0
+    beda = beda_kolom.any(axis=1)
+    ubah = {int(i): df_file.loc[i, kolom].to_dict() for i in sama[beda.to_numpy()]}
+    hapus = [int(i) for i in df.index.difference(df_file.index)]
+    # Baris baru memakai id dari file supaya id tetap stabil
+    sisip = {int(i): df_file.loc[i, kolom].to_dict() for i in df_file.index.difference(df.index)}
+
+    if not (ubah or hapus or sisip):
+        _mtime_dikenal[path] = mtime
+        return _snapshot
+    # Tulis balik hanya kalau file belum punya id untuk semua baris atau harga_angka-nya basi
+    snap = _terapkan(sisip, ubah, hapus, persist=tulis_balik, path=path)
+    if not tulis_balik:
+        _mtime_dikenal[path] = mtime
+    return snap
+
+# ===== Mode pantau file =====
+def mulai_pantau(interval: float = 2.0, path: Path = DATA_CSV) -> threading.Thread:
+    """Polling mtime CSV; kalau berubah, selisihnya diterapkan lewat ``muat_ulang``.
+
+    Tulisan admin ke CSV yang sama juga mengubah mtime; muat ulangnya tidak menemukan
+    selisih sehingga tidak membuat versi baru.
+    """
+    def _loop():
+        terakhir = path.stat().st_mtime
+        while True:
+            time.sleep(interval)
+            try:
+                mtime = path.stat().st_mtime
+                if mtime == terakhir:
+                    continue
+                snap = muat_ulang(path)
+                # mtime baru dicatat setelah berhasil, jadi kegagalan dicoba lagi di polling berikutnya
+                terakhir = mtime
+                print(f"[KATALOG] {path.name} berubah → versi {snap.versi}")
+            except Exception as e:
+                print("[KATALOG] gagal memuat ulang:", e)
+
+    t = threading.Thread(target=_loop, name="pantau-katalog", daemon=True)
+    t.start()
+    return t
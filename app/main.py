@@ -3,15 +3,21 @@ import re
 import asyncio
 from pathlib import Path
 import pandas as pd
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import PlainTextResponse, FileResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
+
+from app import katalog
+from app.admin import router as admin_router
+from app.facet import ekstrak_filter
+from app.respons import (
+    CACHE_STATIS, JSONCepat, KompresiMiddleware, StaticCache,
+    buat_etag, etag_cocok, header_cache, tidak_berubah,
+)
 
 # ===== Path aman (berbasis file ini) =====
 APP_DIR = Path(__file__).resolve().parent
 ROOT_DIR = APP_DIR.parent
-DATA_CSV = APP_DIR / "data" / "data_mobil_final.csv"
 FRONTEND_DIR = ROOT_DIR / "frontend"
 
 app = FastAPI()
@@ -23,26 +29,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# ===== Kompresi gzip/brotli sesuai Accept-Encoding =====
+app.add_middleware(KompresiMiddleware)
+
 # ===== Layani frontend =====
-app.mount("/frontend", StaticFiles(directory=str(FRONTEND_DIR)), name="frontend")
+app.mount("/frontend", StaticCache(directory=str(FRONTEND_DIR)), name="frontend")
 
 @app.get("/")
-def root():
+def root(request: Request):
     index_html = FRONTEND_DIR / "index.html"
-    return FileResponse(str(index_html))
-
-# ===== Baca dataset =====
-data_mobil = pd.read_csv(DATA_CSV)
-data_mobil.columns = data_mobil.columns.str.strip().str.lower()
-
-if "harga_angka" not in data_mobil.columns:
-    def bersihkan_harga(h):
-        if pd.isna(h): return 0
-        s = str(h)
-        return int(re.sub(r"\D", "", s)) if re.search(r"\d", s) else 0
-    data_mobil["harga_angka"] = data_mobil["harga"].apply(bersihkan_harga)
+    response = FileResponse(
+        str(index_html), stat_result=os.stat(index_html), headers={"Cache-Control": CACHE_STATIS}
+    )
+    if etag_cocok(request, response.headers["etag"]):
+        return tidak_berubah(response.headers["etag"], CACHE_STATIS)
+    return response
 
 def unique_cars(output: str) -> str:
     found = re.findall(r"([a-z0-9 .\-]+)\s*\((\d{4})\)", output.lower())
@@ -61,7 +65,7 @@ def _bersih_nama(nama: str, tahun: int) -> str:
 # ===== Endpoint streaming (SSE) =====
 @app.get("/stream")
 async def stream(pertanyaan: str, exclude: str = ""):
-    jawaban_text = jawab(pertanyaan, exclude)  # panggil fungsi di bawah
+    jawaban_text = cari_jawaban(katalog.snapshot(), ekstrak_filter(pertanyaan, exclude))
     async def event_stream():
         for word in jawaban_text.split():
             yield f"data: {word}\n\n"
@@ -70,53 +74,51 @@ async def stream(pertanyaan: str, exclude: str = ""):
 
 # ===== Endpoint rule-based utama =====
 @app.get("/jawab", response_class=PlainTextResponse)
-def jawab(pertanyaan: str, exclude: str = ""):
-    hasil = data_mobil.copy()
-    q = pertanyaan.lower()
-    tahun_sekarang = 2025
-
-    # Usia
-    m_usia = re.search(r"usia (?:di bawah|kurang dari) (\d+)\s*tahun", q)
-    if m_usia:
-        batas_tahun = tahun_sekarang - int(m_usia.group(1))
-        hasil = hasil[hasil["tahun"] >= batas_tahun]
+def jawab(request: Request, pertanyaan: str, exclude: str = ""):
+    snap = katalog.snapshot()
+    filt = ekstrak_filter(pertanyaan, exclude)
+    # Pertanyaan berbeda dengan filter sama → ETag sama
+    etag = buat_etag("jawab", snap.sidik, filt)
+    if etag_cocok(request, etag):
+        return tidak_berubah(etag)
+    return PlainTextResponse(cari_jawaban(snap, filt), headers=header_cache(etag))
+
+def saring_katalog(data: pd.DataFrame, filt: dict) -> pd.DataFrame:
+    # Snapshot tidak pernah diubah di tempat; filter boolean selalu menghasilkan frame baru
+    hasil = data
+
+    # Usia / tahun ke atas
+    if filt["tahun_min"] is not None:
+        hasil = hasil[hasil["tahun"] >= filt["tahun_min"]]
 
     # Transmisi
-    if "matic" in q and "manual" not in q:
-        hasil = hasil[hasil["transmisi"].str.contains("matic", case=False, na=False)]
-    if "manual" in q and "matic" not in q:
-        hasil = hasil[hasil["transmisi"].str.contains("manual", case=False, na=False)]
+    if filt["transmisi"]:
+        hasil = hasil[hasil["transmisi"].str.contains(filt["transmisi"], case=False, na=False)]
 
     # Bahan bakar
-    for bb in ["diesel", "bensin", "hybrid", "listrik"]:
-        if bb in q:
-            hasil = hasil[hasil["bahan bakar"].str.contains(bb, case=False, na=False)]
+    for bb in filt["bahan_bakar"]:
+        hasil = hasil[hasil["bahan bakar"].str.contains(bb, case=False, na=False)]
 
     # Harga (contoh: "di bawah 150.000.000" / "max 200000000")
-    m_harga = re.search(r"(?:di bawah|max(?:imal)?|<=?) ?rp? ?(\d[\d\.]*)", q)
-    if m_harga:
-        batas = int(m_harga.group(1).replace(".", ""))
-        hasil = hasil[hasil["harga_angka"] <= batas]
-
-    # Tahun ke atas
-    m_tahun_atas = re.search(r"tahun (\d{4}) ke atas", q)
-    if m_tahun_atas:
-        hasil = hasil[hasil["tahun"] >= int(m_tahun_atas.group(1))]
+    if filt["harga_maks"] is not None:
+        hasil = hasil[hasil["harga_angka"] <= filt["harga_maks"]]
 
     # Tahun di bawah
-    m_tahun_bawah = re.search(r"tahun (?:di bawah|kurang dari) (\d{4})", q)
-    if m_tahun_bawah:
-        hasil = hasil[hasil["tahun"] < int(m_tahun_bawah.group(1))]
+    if filt["tahun_di_bawah"] is not None:
+        hasil = hasil[hasil["tahun"] < filt["tahun_di_bawah"]]
 
     # Sinonim irit/hemat → bensin/hybrid
-    if "irit" in q or "hemat" in q:
+    if filt["irit"]:
         hasil = hasil[hasil["bahan bakar"].str.contains("bensin|hybrid", case=False, na=False)]
 
     # Exclude list (nama mobil yang sudah ditampilkan)
-    exclude_list = [x.strip().lower() for x in exclude.split(",") if x.strip()]
-    if exclude_list:
-        hasil = hasil[~hasil["nama mobil"].str.lower().isin(exclude_list)]
+    if filt["exclude"]:
+        hasil = hasil[~hasil["nama mobil"].str.lower().isin(filt["exclude"])]
+
+    return hasil
 
+def cari_jawaban(snap: katalog.Snapshot, filt: dict) -> str:
+    hasil = saring_katalog(snap.data, filt)
     if hasil.empty:
         return "tidak ditemukan"
 
@@ -126,19 +128,41 @@ def jawab(pertanyaan: str, exclude: str = ""):
     )
     return unique_cars(output)
 
+# ===== Endpoint facet (hitungan per filter untuk sidebar) =====
+@app.get("/facet")
+def facet(request: Request, pertanyaan: str = "", exclude: str = ""):
+    snap = katalog.snapshot()
+    etag = buat_etag("facet", snap.sidik, ekstrak_filter(pertanyaan, exclude))
+    if etag_cocok(request, etag):
+        return tidak_berubah(etag)
+    return JSONCepat(snap.facet.facet(pertanyaan, exclude), headers=header_cache(etag))
+
+# ===== Admin katalog (insert/update/delete tanpa restart) =====
+app.include_router(admin_router)
+
+# Mode pantau file: perubahan data_mobil_final.csv diterapkan otomatis
+if os.getenv("WATCH_KATALOG", "0") == "1":
+    katalog.mulai_pantau(float(os.getenv("WATCH_INTERVAL", "2")))
+
 # ===== (Opsional) RAG berbasis CPU =====
 if os.getenv("ENABLE_RAG", "0") == "1":
     try:
-        from app.rag_qa import router as rag_qa_router
+        from app.rag_qa import router as rag_qa_router, sinkron_vektor, chroma_sesuai_katalog
         app.include_router(rag_qa_router)
 
-        # Auto-bangun index Chroma kalau belum ada
+        # Auto-bangun index Chroma kalau belum ada, atau id dokumennya tidak sama dengan id katalog
         CHROMA_DIR = ROOT_DIR / "chroma"
-        if not CHROMA_DIR.exists():
-            print("[INIT] chroma/ belum ada → generate embedding...")
+        if not CHROMA_DIR.exists() or not chroma_sesuai_katalog():
+            print("[INIT] chroma/ belum ada atau tidak sesuai katalog → generate embedding...")
             from app.embedding import simpan_vektor_mobil
             simpan_vektor_mobil()
         else:
             print("[INIT] chroma/ sudah ada.")
+
+        # Sinkron inkremental hanya aman kalau dokumen Chroma ber-id katalog
+        if chroma_sesuai_katalog():
+            katalog.daftarkan_pendengar(sinkron_vektor)
+        else:
+            print("[INIT] id Chroma tetap tidak sesuai katalog; update katalog tidak disinkronkan ke Chroma.")
     except Exception as e:
         print("[INIT] ENABLE_RAG=1 tapi gagal load RAG:", e)
@@ -1,7 +1,7 @@
 import os
 import re
 import random
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 
 # ===== Pilih embedding: Ollama (kalau ada) atau CPU (default) =====
 if os.getenv("USE_OLLAMA", "0") == "1":
@@ -14,8 +14,18 @@ else:
 
 from langchain_chroma import Chroma
 
+from app import katalog
+from app.embedding import dokumen_mobil
+from app.respons import JSONCepat, buat_etag, etag_cocok, header_cache, tidak_berubah
+
 router = APIRouter()
 
+# Urutan kolom untuk mode ringkas (list baris, tanpa teks jawaban yang diformat)
+KOLOM_RINGKAS = [
+    "nama_mobil", "tahun", "harga", "harga_angka", "usia",
+    "bahan_bakar", "transmisi", "kapasitas_mesin", "cosine_score",
+]
+
 def valid_int(x, default=0):
     try:
         return int(float(x))
@@ -32,12 +42,61 @@ def is_kapasitas_mesin_valid(kapasitas, bahan_bakar):
     except Exception:
         return False
 
+def sinkron_vektor(snap, diubah, dihapus):
+    """Pendengar app.katalog: upsert/hapus dokumen Chroma per id, tanpa re-embed seluruh katalog."""
+    vector_store = Chroma(
+        persist_directory="chroma",
+        embedding_function=EMBEDDINGS,
+    )
+    ids_ubah = [str(i) for i in diubah.index]
+    # Isi lama disimpan dulu supaya upsert bisa dibatalkan kalau langkah hapus gagal
+    lama = vector_store.get(ids=ids_ubah, include=["documents", "metadatas"]) if ids_ubah else None
+
+    # Upsert dulu, hapus paling akhir: kalau upsert gagal, Chroma masih utuh di versi lama
+    if ids_ubah:
+        dokumen = [dokumen_mobil(row) for _, row in diubah.iterrows()]
+        vector_store.add_texts(
+            texts=[teks for teks, _ in dokumen],
+            metadatas=[meta for _, meta in dokumen],
+            ids=ids_ubah,
+        )
+    if dihapus:
+        try:
+            vector_store.delete(ids=[str(i) for i in dihapus])
+        except Exception:
+            if lama is not None:
+                baru = [i for i in ids_ubah if i not in set(lama["ids"])]
+                if baru:
+                    vector_store.delete(ids=baru)
+                if lama["ids"]:
+                    vector_store.add_texts(texts=lama["documents"], metadatas=lama["metadatas"], ids=lama["ids"])
+            raise
+    print(f"[KATALOG] Chroma disinkronkan ke versi {snap.versi}")
+
+def chroma_sesuai_katalog() -> bool:
+    """True kalau id dokumen Chroma persis sama dengan id katalog (index lama ber-id UUID → False)."""
+    vector_store = Chroma(
+        persist_directory="chroma",
+        embedding_function=EMBEDDINGS,
+    )
+    ids_chroma = set(vector_store.get(include=[])["ids"])
+    return ids_chroma == {str(i) for i in katalog.snapshot().data.index}
+
 @router.get("/cosine_rekomendasi")
 async def cosine_rekomendasi(
+    request: Request,
     query: str = Query(..., description="Pertanyaan kebutuhan mobil (mis. 'mpv 200 juta')"),
     k: int = Query(5, description="Jumlah hasil"),
-    exclude: str = Query("", description="Nama mobil yang sudah direkomendasikan, pisahkan koma")
+    exclude: str = Query("", description="Nama mobil yang sudah direkomendasikan, pisahkan koma"),
+    ringkas: bool = Query(False, description="Hanya field terstruktur (kolom + baris), tanpa teks 'jawaban'"),
 ):
+    exclude_list = [x.strip().lower() for x in exclude.split(",") if x.strip()]
+    etag = buat_etag(
+        "cosine", katalog.snapshot().sidik, " ".join(query.lower().split()), k, sorted(exclude_list), ringkas
+    )
+    if etag_cocok(request, etag):
+        return tidak_berubah(etag)
+
     vector_store = Chroma(
         persist_directory="chroma",
         embedding_function=EMBEDDINGS,
@@ -75,7 +134,6 @@ async def cosine_rekomendasi(
             filter_bb = bb
             break
 
-    exclude_list = [x.strip().lower() for x in exclude.split(",") if x.strip()]
     hasil_utama, hasil_tua, hasil_lain = [], [], []
     seen = set()
 
@@ -125,7 +183,8 @@ async def cosine_rekomendasi(
 
     hasil_utama = sorted(hasil_utama, key=lambda x: (abs(x['harga_angka']-(harga_target or 0)), x['usia']))
     hasil_tua   = sorted(hasil_tua,   key=lambda x: (x['usia'], abs(x['harga_angka']-(harga_target or 0))))
-    random.shuffle(hasil_lain)
+    # Diacak tapi deterministik per ETag, supaya satu ETag selalu berarti body yang sama
+    random.Random(etag).shuffle(hasil_lain)
 
     hasil_final = (hasil_utama + hasil_tua + hasil_lain)[:k]
 
@@ -154,8 +213,17 @@ async def cosine_rekomendasi(
                 break
         hasil_final = alt
 
+    if ringkas:
+        return JSONCepat(
+            {"kolom": KOLOM_RINGKAS, "rekomendasi": [[m[c] for c in KOLOM_RINGKAS] for m in hasil_final]},
+            headers=header_cache(etag),
+        )
+
     if not hasil_final:
-        return {"jawaban": "Maaf, tidak ditemukan mobil yang sesuai.", "rekomendasi": []}
+        return JSONCepat(
+            {"jawaban": "Maaf, tidak ditemukan mobil yang sesuai.", "rekomendasi": []},
+            headers=header_cache(etag),
+        )
 
     out = "Rekomendasi berdasarkan Cosine Similarity:\n\n"
     for i, m in enumerate(hasil_final, 1):
@@ -168,4 +236,4 @@ async def cosine_rekomendasi(
             f"    Transmisi: {m['transmisi'].capitalize()}\n"
             f"    Kapasitas Mesin: {m['kapasitas_mesin']}\n\n"
         )
-    return {"jawaban": out, "rekomendasi": hasil_final}
+    return JSONCepat({"jawaban": out, "rekomendasi": hasil_final}, headers=header_cache(etag))
@@ -0,0 +1,135 @@
+import hashlib
+import json
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# ===== Encoder JSON cepat (orjson kalau ada) =====
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ===== Brotli opsional; tanpa paket ini cukup gzip =====
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CACHE_API = "public, no-cache"          # boleh disimpan browser/CDN, tapi selalu revalidasi pakai ETag
+CACHE_STATIS = "public, max-age=300"
+MIN_KOMPRESI = 500                       # byte; respons lebih kecil tidak sepadan dikompres
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class JSONCepat(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+# ===== ETag: kunci = maksud query + versi katalog =====
+def buat_etag(*bagian) -> str:
+    kunci = json.dumps(bagian, sort_keys=True, default=str).encode("utf-8")
+    return 'W/"' + hashlib.blake2b(kunci, digest_size=12).hexdigest() + '"'
+
+def etag_cocok(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+
+def header_cache(etag: str, cache_control: str = CACHE_API) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+def tidak_berubah(etag: str, cache_control: str = CACHE_API) -> Response:
+    # 304 memperbarui header yang disimpan cache (RFC 9111), jadi kebijakannya harus sama dengan 200
+    return Response(status_code=304, headers=header_cache(etag, cache_control))
+
+# ===== Kompresi per klien (br > gzip) =====
+def pilih_encoding(accept_encoding: str):
+    diterima = set()
+    for bagian in accept_encoding.lower().split(","):
+        nama, _, param = bagian.strip().partition(";")
+        if param.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        diterima.add(nama.strip())
+    if brotli is not None and ("br" in diterima or "*" in diterima):
+        return "br"
+    if "gzip" in diterima or "*" in diterima:
+        return "gzip"
+    return None
+
+class BrotliResponder(IdentityResponder):
+    """Padanan GZipResponder milik Starlette, tapi dengan brotli (juga untuk respons streaming)."""
+
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        super().__init__(app, minimum_size)
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=5)
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+class KompresiMiddleware:
+    """br (kalau paket brotli terpasang) atau gzip sesuai Accept-Encoding.
+
+    Pilihan encoding (termasuk ``q=0`` dan ``*``) diputuskan ``pilih_encoding``, lalu
+    dijalankan responder Starlette: GZipResponder, BrotliResponder, atau IdentityResponder
+    (tanpa kompresi) kalau tidak ada encoding yang diterima. Tipe yang dikecualikan
+    (mis. SSE /stream) ditangani responder tersebut.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MIN_KOMPRESI):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def kirim(message: Message):
+            if message["type"] == "http.response.start" and message["status"] != 206:
+                # Validator harus sama di 200 (terkompres atau tidak, kecil atau besar) dan 304
+                # (RFC 9110 §15.4.5), padahal 304 tidak membawa Content-Type/Content-Encoding.
+                # Jadi semua respons memakai ETag lemah + Vary: Accept-Encoding; 206 dibiarkan
+                # karena Range/If-Range butuh ETag kuat.
+                headers = MutableHeaders(scope=message)
+                vary = [v.strip().lower() for v in headers.get("vary", "").split(",")]
+                if "accept-encoding" not in vary:
+                    headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = "W/" + etag
+            await send(message)
+
+        encoding = pilih_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=6)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, kirim)
+
+# ===== File statis dengan Cache-Control =====
+class StaticCache(StaticFiles):
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = CACHE_STATIS
+        return response
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from app import katalog
+from app.facet import FacetIndex, ekstrak_filter
+from app.main import saring_katalog
+
+PERTANYAAN = [
+    "",
+    "listrik",
+    "mobil matic diesel di bawah rp 500.000.000",
+    "di bawah rp 500.000.000",
+    "matic max rp 200000000",
+    "irit manual tahun 2018 ke atas",
+    "usia di bawah 5 tahun hybrid",
+    "tahun di bawah 2017 bensin",
+    "bensin tahun kurang dari 2020 di bawah rp 150.000.000",
+]
+
+def cek_sesuai_jawab(df: pd.DataFrame):
+    index = FacetIndex(df)
+    for q in PERTANYAAN:
+        filt = ekstrak_filter(q)
+        assert index.id_cocok(index.cari(filt)) == sorted(int(i) for i in saring_katalog(df, filt).index), q
+
+def test_parsing_harga():
+    assert ekstrak_filter("di bawah rp 500.000.000")["harga_maks"] == 500_000_000
+    assert ekstrak_filter("matic max rp 200000000")["harga_maks"] == 200_000_000
+
+@pytest.mark.parametrize("q", PERTANYAAN)
+def test_facet_sesuai_jawab(q):
+    df = katalog.snapshot().data
+    index = FacetIndex(df)
+    filt = ekstrak_filter(q)
+    assert index.id_cocok(index.cari(filt)) == sorted(int(i) for i in saring_katalog(df, filt).index)
+
+def test_harga_dan_tahun_kosong_tidak_ikut_filter_maupun_bucket():
+    df = katalog.snapshot().data.copy()
+    df.loc[[0, 1], "harga_angka"] = float("nan")
+    df["tahun"] = df["tahun"].astype(float)
+    df.loc[[2, 3], "tahun"] = float("nan")
+    cek_sesuai_jawab(df)
+
+    index = FacetIndex(df)
+    hasil = index.facet("")
+    assert sum(hasil["facet"]["harga"].values()) == len(df) - df["harga_angka"].isna().sum()
+    assert sum(hasil["facet"]["tahun"].values()) == len(df) - 2
+    assert 0 not in index.id_cocok(index.cari(ekstrak_filter("di bawah rp 1.000.000.000.000")))
+    assert 2 not in index.id_cocok(index.cari(ekstrak_filter("tahun 1900 ke atas")))
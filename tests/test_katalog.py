@@ -0,0 +1,158 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app import katalog
+from app.facet import FacetIndex, ekstrak_filter
+from app.main import saring_katalog
+
+PERTANYAAN = [
+    "",
+    "listrik",
+    "mobil matic diesel di bawah rp 500.000.000",
+    "di bawah rp 500.000.000",
+    "irit manual tahun 2018 ke atas",
+    "usia di bawah 5 tahun hybrid",
+    "tahun di bawah 2017 bensin",
+    "matic di bawah rp 150.000.000",
+]
+
+MOBIL_BARU = {
+    "nama_mobil": "Wuling Air Ev Lite (2024)",
+    "harga": "Rp 120.000.000",
+    "tahun": 2024,
+    "usia": 1,
+    "bahan_bakar": "Listrik",
+    "transmisi": "Matic",
+    "kapasitas_mesin": "-",
+}
+
+@pytest.fixture(autouse=True)
+def katalog_asli(monkeypatch):
+    # Setiap test mulai dari snapshot awal, tanpa pendengar dan tanpa menulis CSV repo
+    monkeypatch.setattr(katalog, "_snapshot", katalog.snapshot())
+    monkeypatch.setattr(katalog, "_pendengar", [])
+
+def cek_facet_sesuai_jawab(snap: katalog.Snapshot):
+    # Pembanding = filter pandas yang dipakai /jawab, bukan salinannya
+    for q in PERTANYAAN:
+        filt = ekstrak_filter(q)
+        assert filt["harga_maks"] is not None or "rp" not in q, q
+        harapan = sorted(int(i) for i in saring_katalog(snap.data, filt).index)
+        assert snap.facet.id_cocok(snap.facet.cari(filt)) == harapan, q
+        assert snap.facet.facet(q) == FacetIndex(snap.data).facet(q), q
+
+def test_snapshot_awal_sesuai_jawab():
+    cek_facet_sesuai_jawab(katalog.snapshot())
+
+def test_update_harga():
+    lama = katalog.snapshot()
+    snap = katalog.terapkan(ubah={0: {"harga": "Rp 100.000.000"}}, persist=False)
+
+    assert snap.versi == lama.versi + 1
+    assert snap.data.loc[0, "harga_angka"] == 100_000_000
+    assert lama.data.loc[0, "harga_angka"] == 458_000_000  # snapshot lama tidak berubah
+    assert snap.sidik != lama.sidik
+    cek_facet_sesuai_jawab(snap)
+
+def test_insert():
+    lama = katalog.snapshot()
+    snap = katalog.terapkan(sisip=[MOBIL_BARU], persist=False)
+
+    id_baru = int(snap.data.index.max())
+    assert id_baru == int(lama.data.index.max()) + 1
+    assert snap.data.loc[id_baru, "harga_angka"] == 120_000_000
+    assert id_baru in snap.facet.id_cocok(snap.facet.cari(ekstrak_filter("listrik di bawah rp 150.000.000")))
+    assert id_baru not in lama.facet.id_cocok(lama.facet.semua)
+    cek_facet_sesuai_jawab(snap)
+
+def test_delete():
+    snap = katalog.terapkan(hapus=[1, 2], persist=False)
+
+    assert 1 not in snap.data.index and 2 not in snap.data.index
+    assert not snap.facet.semua >> 1 & 1
+    assert katalog.snapshot().versi == 1
+    cek_facet_sesuai_jawab(snap)
+
+def test_batch_overlap_ditolak():
+    with pytest.raises(ValueError):
+        katalog.terapkan(ubah={6: {"harga": "Rp 1"}}, hapus=[6], persist=False)
+    assert katalog.snapshot().versi == 0
+
+def test_update_kosong_tidak_membuat_versi():
+    harga = katalog.snapshot().data.loc[6, "harga"]
+    assert katalog.terapkan(ubah={6: {}}, persist=False).versi == 0
+    assert katalog.terapkan(ubah={6: {"harga": harga}}, persist=False).versi == 0
+
+def test_pendengar_gagal_membatalkan_perubahan():
+    def gagal(*args):
+        raise IOError("vector store mati")
+
+    katalog.daftarkan_pendengar(gagal)
+    with pytest.raises(RuntimeError):
+        katalog.terapkan(ubah={3: {"harga": "Rp 5"}}, persist=False)
+    assert katalog.snapshot().versi == 0
+
+def test_muat_ulang_edit_harga(tmp_path):
+    lama = katalog.snapshot()
+    csv = tmp_path / "katalog.csv"
+    katalog.simpan_csv(lama.data, csv)
+
+    assert ".0\n" not in csv.read_text()  # harga_angka ditulis sebagai int
+
+    df = pd.read_csv(csv)
+    df.loc[df["id"] == 4, "Harga"] = "Rp 10.000.000"
+    df.to_csv(csv, index=False)
+
+    snap = katalog.muat_ulang(csv)
+    assert snap.data.loc[4, "harga"] == "Rp 10.000.000"
+    assert snap.data.loc[4, "harga_angka"] == 10_000_000
+    assert 4 not in lama.facet.id_cocok(lama.facet.cari(ekstrak_filter("di bawah rp 20.000.000")))
+    assert 4 in snap.facet.id_cocok(snap.facet.cari(ekstrak_filter("di bawah rp 20.000.000")))
+    cek_facet_sesuai_jawab(snap)
+
+    # harga_angka yang sudah dihitung ulang ikut ditulis, jadi muat ulang berikutnya tidak berubah apa-apa
+    assert katalog.muat_ulang(csv).versi == snap.versi
+
+def test_admin_tidak_menimpa_edit_file_yang_belum_dimuat(tmp_path, monkeypatch):
+    csv = tmp_path / "katalog.csv"
+    katalog.simpan_csv(katalog.snapshot().data, csv)
+    monkeypatch.setattr(katalog, "DATA_CSV", csv)
+    monkeypatch.setattr(katalog, "_mtime_dikenal", {csv: csv.stat().st_mtime_ns})
+
+    # Edit dari luar yang belum sempat diambil mode pantau
+    df = pd.read_csv(csv)
+    df.loc[df["id"] == 4, "Harga"] = "Rp 10.000.000"
+    df.to_csv(csv, index=False)
+    os.utime(csv, ns=(csv.stat().st_atime_ns, csv.stat().st_mtime_ns + 10**9))
+
+    snap = katalog.terapkan(ubah={0: {"harga": "Rp 100.000.000"}})
+    assert snap.data.loc[4, "harga_angka"] == 10_000_000
+    assert snap.data.loc[0, "harga_angka"] == 100_000_000
+
+    # File berisi kedua perubahan, dan muat ulang sesudahnya tidak membatalkan tulisan admin
+    df = pd.read_csv(csv).set_index("id")
+    assert df.loc[4, "Harga"] == "Rp 10.000.000" and df.loc[0, "Harga"] == "Rp 100.000.000"
+    assert katalog.muat_ulang(csv).versi == snap.versi
+
+def test_pendengar_gagal_mengembalikan_csv(tmp_path):
+    csv = tmp_path / "katalog.csv"
+    katalog.simpan_csv(katalog.snapshot().data, csv)
+    isi = csv.read_bytes()
+    dilihat = []
+
+    def gagal(snap, *args):
+        dilihat.append(pd.read_csv(csv).set_index("id").loc[3, "Harga"])
+        raise IOError("vector store mati")
+
+    katalog.daftarkan_pendengar(gagal)
+    df = pd.read_csv(csv)
+    df.loc[df["id"] == 3, "Harga"] = "Rp 5"
+    df.to_csv(csv, index=False)
+    with pytest.raises(RuntimeError):
+        katalog.muat_ulang(csv)  # harga_angka basi → ditulis balik sebelum pendengar jalan
+
+    assert dilihat == ["Rp 5"]
+    assert katalog.snapshot().versi == 0
+    assert pd.read_csv(csv).set_index("id").loc[3, "Harga"] == "Rp 5"
@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+def cek_304_sama_dengan_200(url: str, **params):
+    for encoding in ("br", "gzip", "identity"):
+        ok = client.get(url, params=params, headers={"Accept-Encoding": encoding})
+        assert ok.status_code == 200
+        tetap = client.get(
+            url, params=params, headers={"Accept-Encoding": encoding, "If-None-Match": ok.headers["etag"]}
+        )
+        assert tetap.status_code == 304, encoding
+        for nama in ("etag", "vary", "cache-control"):
+            assert tetap.headers[nama] == ok.headers[nama], (encoding, nama)
+        assert ok.headers["etag"].startswith("W/")
+        assert "Accept-Encoding" in ok.headers["vary"]
+
+def test_304_halaman_utama():
+    cek_304_sama_dengan_200("/")
+
+def test_304_facet():
+    cek_304_sama_dengan_200("/facet", pertanyaan="matic di bawah rp 300.000.000")
+
+def test_q0_tidak_dikompres():
+    for accept in ("gzip;q=0", "br;q=0, gzip;q=0", "identity"):
+        r = client.get("/", headers={"Accept-Encoding": accept})
+        assert "content-encoding" not in r.headers, accept
+    assert client.get("/", headers={"Accept-Encoding": "br;q=0, gzip"}).headers["content-encoding"] == "gzip"
+    assert client.get("/", headers={"Accept-Encoding": "*"}).headers["content-encoding"] in ("br", "gzip")